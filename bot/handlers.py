@@ -1,7 +1,7 @@
 from aiogram.filters import CommandStart, Command, CommandObject
 from aiogram.types import Message, CallbackQuery
 from aiogram import Router, F
-from tmdb_api.search import search_movie, search_tv, get_tv_details
+from tmdb_api.search import search_movie, search_tv, search_all, get_tv_details
 from aiogram.fsm.state import StatesGroup, State
 from aiogram.fsm.context import FSMContext
 from bot.keyboards import get_pagination_keyboard, get_seasons_keyboard, get_episodes_keyboard
@@ -33,7 +33,9 @@ def escape_markdown(text):
 def format_results(items, item_type='movie'):
     result_string = ""
     for i, item in enumerate(items):
-        if item_type == 'movie':
+        # Merged /search results carry their own type
+        kind = item.get('media_type', item_type)
+        if kind == 'movie':
             title_text = item.get('title', 'N/A')
             date_text = item.get('release_date', 'N/A')
             item_id = item['id']
@@ -52,6 +54,8 @@ def format_results(items, item_type='movie'):
         original_language = escape_markdown(item.get('original_language', 'N/A'))
 
         result_string += f"*{i+1}\\.* __{title}__\n"
+        if item_type == 'all':
+            result_string += f"*Type:* {'Movie' if kind == 'movie' else 'TV show'}\n"
         result_string += f"*Overview:* _{overview}_\n"
         result_string += f"*Rating:* {rating}\n"
         result_string += f"*Original language:* {original_language}\n"
@@ -63,7 +67,7 @@ async def cmd_start(message: Message):
     user = message.from_user.username
     action = "/start"
     log_message(user, action)
-    bot_message = f"Hello, *{escape_markdown(message.from_user.first_name)}*, You’re using a bot for searching movies & TV shows 🎬\nTo start searching, use /movie or /tv\_show commands"
+    bot_message = f"Hello, *{escape_markdown(message.from_user.first_name)}*, You’re using a bot for searching movies & TV shows 🎬\nTo start searching, use /movie, /tv\_show or /search \(movies and TV shows\) commands"
     await message.answer(text=bot_message, parse_mode='MarkdownV2')
     log_message(user, action, bot_message)
 
@@ -89,6 +93,17 @@ async def cmd_tv(message: Message, state: FSMContext):
     await state.update_data(search_type='tv')
     await state.set_state(SearchState.waiting_for_query)
 
+@router.message(Command("search"))
+async def cmd_search(message: Message, state: FSMContext):
+    user = message.from_user.username
+    action = "/search"
+    log_message(user, action)
+    bot_message = "Please enter the name of the movie or TV show you’re looking for: 🎬📺"
+    await message.answer(bot_message)
+    log_message(user, action, bot_message)
+    await state.update_data(search_type='all')
+    await state.set_state(SearchState.waiting_for_query)
+
 @router.message(F.text.regexp(r"^/view_tv_(\d+)$"))
 async def process_view_tv(message: Message):
     user = message.from_user.username
@@ -149,6 +164,8 @@ async def process_query(message: Message, state: FSMContext):
 
     if search_type == 'movie':
         results = search_movie(query)
+    elif search_type == 'all':
+        results = await search_all(query)
     else:
         results = search_tv(query)
 
@@ -163,7 +180,8 @@ async def process_query(message: Message, state: FSMContext):
                              parse_mode='MarkdownV2')
         log_message(user, action, bot_message)
     elif isinstance(results, list) and not results:
-        bot_message = f"No {search_type}s were found with that name 😕\nPlease check your spelling 🎬✨"
+        search_label = "movies or TV shows" if search_type == 'all' else f"{search_type}s"
+        bot_message = f"No {search_label} were found with that name 😕\nPlease check your spelling 🎬✨"
         await message.answer(bot_message)
         log_message(user, action, bot_message)
         await state.clear()
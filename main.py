@@ -5,21 +5,25 @@ import itertools
 import threading
 import os
 import random
-from dotenv import load_dotenv
+from dotenv import load_dotenv, find_dotenv
 from aiogram import Bot, Dispatcher
 from bot.handlers import router
 from nostr.main import post_to_nostr
-
-load_dotenv()
-TOKEN = os.getenv("TOKEN_TG_BOT_MOVIES")
+from tmdb_api.search import install_dns_workaround
 from tmdb_api.movie_request import (
     request_trending_movies, 
     pick_unique_trending, 
-    request_random_movie,
     pick_unique_random, 
     register_post,
-    post_to_telegram
+    load_recent_posts
 )
+from tmdb_api.channels import publish_to_channels
+
+def init_app():
+    # All startup side effects live here so that importing any module stays cheap
+    load_dotenv(find_dotenv())
+    install_dns_workaround()
+    load_recent_posts()
 
 def content_loop():
     tasks = itertools.cycle(["trending", "random"])  # alternating forever
@@ -37,16 +41,20 @@ def content_loop():
             movie = pick_unique_random()
         
         if movie:
-            asyncio.run(post_to_telegram(movie))
+            results = asyncio.run(publish_to_channels(movie))
             asyncio.run(post_to_nostr(movie))
-            register_post(movie["id"])
+            sent = sum(result["status"] == "sent" for result in results)
+            print(f"Posted '{movie.get('title')}' to {sent}/{len(results)} Telegram channels")
+            # A movie that reached no channel stays eligible for a later slot
+            if sent:
+                register_post(movie["id"])
         
         # Sleep for 3 hours +/- 15 minutes
         sleep_duration = 3 * 60 * 60 + random.randint(-15 * 60, 15 * 60)
         time.sleep(sleep_duration)
 
 async def main():
-    bot = Bot(token=TOKEN)
+    bot = Bot(token=os.getenv("TOKEN_TG_BOT_MOVIES"))
     dp = Dispatcher()
     dp.include_router(router)
 
@@ -57,6 +65,7 @@ async def main():
 
 if __name__ == '__main__':
     logging.basicConfig(level=logging.INFO)
+    init_app()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
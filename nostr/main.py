@@ -1,12 +1,7 @@
 import os
 import asyncio
-from dotenv import load_dotenv
-from nostr_sdk import Keys, Client, EventBuilder, NostrSigner, RelayUrl
 from tmdb_api.movie_request import get_genre_names
 
-# Load environment variables
-load_dotenv()
-
 async def post_to_nostr(movie):
     # Get the private key from .env
     nsec = os.getenv("NOSTR_PRIVET_KEY")
@@ -14,6 +9,9 @@ async def post_to_nostr(movie):
         print("NOSTR_PRIVET_KEY not found in .env file, skipping Nostr post.")
         return
 
+    # Native extension, only loaded when Nostr posting is actually enabled
+    from nostr_sdk import Keys, Client, EventBuilder, NostrSigner, RelayUrl
+
     try:
         keys = Keys.parse(nsec)
         signer = NostrSigner.keys(keys)
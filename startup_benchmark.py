@@ -0,0 +1,73 @@
+"""
+Startup benchmark: imports the bot modules under `python -X importtime` and
+fails if startup got slower than the budget or pulled in a lazily loaded module.
+
+Usage: python startup_benchmark.py [--budget-ms 400] [--runs 5] [--allow-missing]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+MODULES = ["main", "bot.handlers", "tmdb_api.movie_request", "tmdb_api.search", "nostr.main"]
+# Must only be imported on first use, never at startup
+LAZY_MODULES = ["nostr_sdk", "requests", "numpy"]
+
+def measure(module):
+    """
+    Runs one cold import of `module` and returns (total_us, {imported_module: cumulative_us}).
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if result.returncode != 0:
+        # Killed children (e.g. by a signal) may leave stderr empty
+        lines = result.stderr.strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else f"exit code {result.returncode}")
+
+    imported = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        cumulative = int(cumulative)
+        imported[name.strip()] = cumulative
+        if not name[1:].startswith(" "):  # nested imports are indented
+            total += cumulative
+    return total, imported
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--budget-ms", type=float, default=400)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--allow-missing", action="store_true",
+                        help="skip modules that fail to import instead of failing the check")
+    args = parser.parse_args()
+
+    failed = False
+    for module in MODULES:
+        try:
+            runs = [measure(module) for _ in range(args.runs)]
+        except RuntimeError as e:
+            if args.allow_missing:
+                print(f"{module:<24} skipped ({e})")
+            else:
+                print(f"{module:<24} failed to import ({e})")
+                failed = True
+            continue
+
+        best_ms = min(total for total, _ in runs) / 1000
+        eager = [name for name in LAZY_MODULES if name in runs[0][1]]
+        status = "ok"
+        if best_ms > args.budget_ms:
+            status, failed = f"over budget ({args.budget_ms:.0f} ms)", True
+        if eager:
+            status, failed = f"imports {', '.join(eager)} at startup", True
+        print(f"{module:<24} {best_ms:8.1f} ms  {status}")
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import asyncio
+import json
+import os
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter
+from tmdb_api.movie_request import (
+    DEFAULT_LANGUAGE,
+    get_timestamp,
+    get_genre_names,
+    get_localized_movie,
+    post_to_telegram
+)
+
+# channels.json format (next to this file):
+# [
+#     {"name": "main", "chat_id": "@movies4free21", "language": "en-US"},
+#     {"name": "horror-de", "chat_id": "-1001234567890", "language": "de-DE", "genres": [27, 53]}
+# ]
+# "genres" is optional: when set, only movies with at least one of these TMDB genre ids are posted.
+CHANNELS_FILE = os.path.join(os.path.dirname(__file__), "channels.json")
+
+# Telegram allows a bot about 30 messages per second overall, keep well below that.
+# Overridable with TG_MAX_CONCURRENT_SENDS, read when publishing (after .env is loaded).
+MAX_CONCURRENT_SENDS = 5
+
+def load_channels():
+    if os.path.exists(CHANNELS_FILE):
+        try:
+            with open(CHANNELS_FILE, "r") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"{get_timestamp()} Could not read {CHANNELS_FILE} ({e}), falling back to CHANNEL_TG.")
+            entries = None
+        if isinstance(entries, list):
+            channels = []
+            for entry in entries:
+                if isinstance(entry, dict) and entry.get("chat_id"):
+                    channels.append(entry)
+                else:
+                    print(f"{get_timestamp()} Skipping channel without chat_id in {CHANNELS_FILE}: {entry!r}")
+            print(f"{get_timestamp()} Loaded {len(channels)} channels from {CHANNELS_FILE}")
+            return channels
+        if entries is not None:
+            print(f"{get_timestamp()} {CHANNELS_FILE} must contain a list of channels, falling back to CHANNEL_TG.")
+
+    # Fall back to the single channel from .env
+    channel_id = os.getenv("CHANNEL_TG")
+    if not channel_id:
+        return []
+    return [{"name": "default", "chat_id": channel_id, "language": DEFAULT_LANGUAGE}]
+
+def get_max_concurrent_sends():
+    value = os.getenv("TG_MAX_CONCURRENT_SENDS")
+    if value is None:
+        return MAX_CONCURRENT_SENDS
+    try:
+        limit = int(value)
+    except ValueError:
+        print(f"{get_timestamp()} TG_MAX_CONCURRENT_SENDS is not a number ({value!r}), using {MAX_CONCURRENT_SENDS}.")
+        return MAX_CONCURRENT_SENDS
+    if limit < 1:
+        print(f"{get_timestamp()} TG_MAX_CONCURRENT_SENDS must be at least 1 (got {limit}), using 1.")
+        return 1
+    return limit
+
+def channel_accepts(channel, movie):
+    wanted = channel.get("genres")
+    if not wanted:
+        return True
+    return bool(set(wanted) & set(movie.get("genre_ids", [])))
+
+def localize_movie(movie, language):
+    # The autoposter fetches movies in DEFAULT_LANGUAGE, other locales need one extra call
+    if language == DEFAULT_LANGUAGE:
+        return movie
+    localized = get_localized_movie(movie["id"], language)
+    if not localized:
+        return movie
+    # Keep the original text when TMDB has no translation
+    return {**movie, **{key: value for key, value in localized.items() if value}}
+
+async def send_to_channel(bot, semaphore, channel, movie):
+    name = channel.get("name", channel["chat_id"])
+    result = {"channel": name, "chat_id": channel["chat_id"], "status": "skipped", "error": None}
+    language = channel.get("language", DEFAULT_LANGUAGE)
+
+    async with semaphore:
+        for attempt in range(2):
+            try:
+                if await post_to_telegram(movie, chat_id=channel["chat_id"], bot=bot, language=language):
+                    result["status"] = "sent"
+                return result
+            except TelegramRetryAfter as e:
+                if attempt == 0:
+                    print(f"{get_timestamp()} Rate limited on {name}, retrying in {e.retry_after}s")
+                    await asyncio.sleep(e.retry_after)
+                    continue
+                result["status"], result["error"] = "failed", str(e)
+            except Exception as e:
+                result["status"], result["error"] = "failed", str(e)
+                break
+
+    print(f"{get_timestamp()} Failed to post to {name}: {result['error']}")
+    return result
+
+async def publish_to_channels(movie, channels=None):
+    # Posts the movie to every configured channel and returns one result dict per channel
+    if channels is None:
+        channels = load_channels()
+    BOT_TOKEN = os.getenv("TOKEN_TG_BOT_POSTER")
+
+    if not BOT_TOKEN or not channels:
+        print(f"{get_timestamp()} Bot token or channels are not set. Please check your environment variables.")
+        return []
+
+    results = []
+    targets = []
+    for channel in channels:
+        if channel_accepts(channel, movie):
+            targets.append(channel)
+        else:
+            results.append({"channel": channel.get("name", channel["chat_id"]), "chat_id": channel["chat_id"],
+                            "status": "filtered", "error": None})
+
+    # Fetch localized metadata and genre names once per locale, shared by all channels in it
+    languages = sorted({channel.get("language", DEFAULT_LANGUAGE) for channel in targets})
+    localized = await asyncio.gather(*(asyncio.to_thread(localize_movie, movie, language) for language in languages))
+    await asyncio.gather(*(asyncio.to_thread(get_genre_names, language) for language in languages))
+    movies = dict(zip(languages, localized))
+
+    semaphore = asyncio.Semaphore(get_max_concurrent_sends())
+    bot = Bot(token=BOT_TOKEN)
+    try:
+        results += await asyncio.gather(*(
+            send_to_channel(bot, semaphore, channel, movies[channel.get("language", DEFAULT_LANGUAGE)])
+            for channel in targets
+        ))
+    finally:
+        await bot.session.close()
+
+    for result in results:
+        print(f"{get_timestamp()} [{result['channel']}] {result['status']}")
+    return results
@@ -0,0 +1,146 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# Local cache of TMDB details (+ videos and genres) keyed by (kind, tmdb_id, language).
+# Records are served without a network call while fresh; stale ones are revalidated
+# with If-None-Match so an unchanged record costs a 304 instead of a full download.
+DB_FILE = os.path.join(os.path.dirname(__file__), "metadata.sqlite3")
+BASE_URL = "https://api.themoviedb.org/3"
+
+# Seconds a record is considered fresh, per kind. TV shows gain seasons/episodes more often.
+MAX_AGE = {
+    "movie": 7 * 24 * 60 * 60,
+    "tv": 24 * 60 * 60,
+}
+
+_lock = threading.Lock()
+_initialized = False
+
+def _connect():
+    global _initialized
+    conn = sqlite3.connect(DB_FILE, timeout=10)
+    if not _initialized:
+        with _lock:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS metadata (
+                    kind TEXT NOT NULL,
+                    tmdb_id INTEGER NOT NULL,
+                    language TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    etag TEXT,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (kind, tmdb_id, language)
+                )
+            """)
+            conn.commit()
+            _initialized = True
+    return conn
+
+@contextmanager
+def _db():
+    # One short-lived connection per call: the autoposter thread and the bot share the store
+    conn = _connect()
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+def _load(kind, tmdb_id, language):
+    # A broken or locked database is treated as a cache miss
+    try:
+        with _db() as conn:
+            row = conn.execute(
+                "SELECT data, etag, fetched_at FROM metadata WHERE kind = ? AND tmdb_id = ? AND language = ?",
+                (kind, tmdb_id, language)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"data": json.loads(row[0]), "etag": row[1], "fetched_at": row[2]}
+    except (sqlite3.Error, ValueError) as e:
+        print(f"Error reading {kind} {tmdb_id} ({language}) from the metadata store: {e}")
+    return None
+
+def _save(kind, tmdb_id, language, data, etag):
+    # Failing to store a record only costs a refetch next time
+    try:
+        with _db() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO metadata (kind, tmdb_id, language, data, etag, fetched_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, tmdb_id, language, json.dumps(data), etag, time.time())
+            )
+    except sqlite3.Error as e:
+        print(f"Error saving {kind} {tmdb_id} ({language}) to the metadata store: {e}")
+
+def _touch(kind, tmdb_id, language):
+    try:
+        with _db() as conn:
+            conn.execute(
+                "UPDATE metadata SET fetched_at = ? WHERE kind = ? AND tmdb_id = ? AND language = ?",
+                (time.time(), kind, tmdb_id, language)
+            )
+    except sqlite3.Error as e:
+        print(f"Error updating {kind} {tmdb_id} ({language}) in the metadata store: {e}")
+
+def _auth():
+    # Search uses the v4 access token, the autoposter the v3 api key; either works here
+    access_token = os.getenv("TMDB_ACCESS_TOKEN")
+    if access_token:
+        return {"Authorization": f"Bearer {access_token}"}, {}
+    return {}, {"api_key": os.getenv("TMDB_API_KEY")}
+
+def get_details(kind, tmdb_id, language="en-US"):
+    """
+    Returns TMDB details for a movie or TV show with `videos` appended (genres are part of details).
+    Served from the local store while fresh, otherwise revalidated/refetched.
+    Falls back to a stale record if TMDB can't be reached. Returns None if nothing is available.
+    """
+    tmdb_id = int(tmdb_id)
+    cached = _load(kind, tmdb_id, language)
+    if cached and time.time() - cached["fetched_at"] < MAX_AGE[kind]:
+        return cached["data"]
+
+    import requests
+    headers, params = _auth()
+    headers["accept"] = "application/json"
+    params.update({
+        "language": language,
+        "append_to_response": "videos",
+        # Fall back to English/untagged videos when there are none in this language
+        "include_video_language": ",".join(dict.fromkeys([language.split("-")[0], "en", "null"])),
+    })
+    if cached and cached["etag"]:
+        headers["If-None-Match"] = cached["etag"]
+
+    try:
+        response = requests.get(f"{BASE_URL}/{kind}/{tmdb_id}", headers=headers, params=params)
+        if response.status_code == 304:
+            _touch(kind, tmdb_id, language)
+            return cached["data"]
+        response.raise_for_status()
+        data = response.json()
+        _save(kind, tmdb_id, language, data, response.headers.get("ETag"))
+        return data
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching {kind} {tmdb_id} ({language}): {e}")
+    except ValueError:
+        print("Failed to decode JSON response.")
+    return cached["data"] if cached else None
+
+def get_cached_details(kind, tmdb_id, language="en-US"):
+    """
+    Returns the stored record regardless of freshness, without any network call. None if not stored.
+    """
+    cached = _load(kind, int(tmdb_id), language)
+    return cached["data"] if cached else None
+
+def get_movie_details(movie_id, language="en-US"):
+    return get_details("movie", movie_id, language)
+
+def get_tv_details(tv_id, language="en-US"):
+    return get_details("tv", tv_id, language)
@@ -1,47 +1,51 @@
 import asyncio
-from aiogram import Bot
+import json
 from dotenv import load_dotenv, find_dotenv
-import requests
 import os
 import time
 import datetime
 import random
+from tmdb_api import metadata_store, scoring
 
 recent_posts = []
 MAX_HISTORY = 20
 RECENT_POSTS_FILE = "tmdb_api/recent_posts.txt"
-genre_cache = None
+DEFAULT_LANGUAGE = "en-US"
+TRENDING_SNAPSHOT_FILE = "tmdb_api/trending_snapshot.json"
+trending_snapshot = None  # loaded from TRENDING_SNAPSHOT_FILE on first use
+RANDOM_POOL_PAGES = 3  # discover pages (20 movies each) scored per random pick
+genre_cache = {}  # language -> {genre_id: genre_name}
 
-def get_genre_names():
-    global genre_cache
-    if genre_cache:
-        return genre_cache
+def get_genre_names(language=DEFAULT_LANGUAGE):
+    if language in genre_cache:
+        return genre_cache[language]
+    import requests
     API_KEY = os.getenv("TMDB_API_KEY")
     url = "https://api.themoviedb.org/3/genre/movie/list"
     params = {
         "api_key": API_KEY,
-        "language": "en-US",
+        "language": language,
     }
     try:
         response = requests.get(url, params=params)
         response.raise_for_status()
         data = response.json()
-        genre_cache = {genre['id']: genre['name'] for genre in data.get('genres', [])}
-        print(f"{get_timestamp()} Loaded genres: {genre_cache}")
-        return genre_cache
+        genre_cache[language] = {genre['id']: genre['name'] for genre in data.get('genres', [])}
+        print(f"{get_timestamp()} Loaded genres ({language}): {genre_cache[language]}")
+        return genre_cache[language]
     except requests.exceptions.RequestException as e:
-        print(f"{get_timestamp()} Error fetching genres: {e}")
+        print(f"{get_timestamp()} Error fetching genres ({language}): {e}")
     return None
 
 def get_timestamp():
     return datetime.datetime.now().strftime("[%d.%m.%Y %H:%M:%S]")
 
 def load_recent_posts():
-    global recent_posts
+    # Called once from the application init step, not at import time
     if os.path.exists(RECENT_POSTS_FILE):
         with open(RECENT_POSTS_FILE, "r") as f:
             ids = [int(line.strip()) for line in f if line.strip().isdigit()]
-            recent_posts.extend(ids[-MAX_HISTORY:])
+            recent_posts[:] = ids[-MAX_HISTORY:]
         print(f"{get_timestamp()} Loaded recent posts: {recent_posts}")
     else:
         print(f"{get_timestamp()} Recent posts file not found, starting with empty history.")
@@ -52,25 +56,30 @@ def save_recent_posts():
             f.write(str(movie_id) + "\n")
     print(f"{get_timestamp()} Saved recent posts: {recent_posts}")
 
-load_recent_posts()
+def find_trailer(details):
+    for video in details.get('videos', {}).get('results', []):
+        if video['type'] == 'Trailer' and video['site'] == 'YouTube':
+            return f"https://www.youtube.com/watch?v={video['key']}"
+    return None
 
-def get_movie_trailer(movie_id):
-    API_KEY = os.getenv("TMDB_API_KEY")
-    url = f"https://api.themoviedb.org/3/movie/{movie_id}/videos"
-    params = {
-        "api_key": API_KEY,
-        "language": "en-US",
+def get_movie_trailer(movie_id, language=DEFAULT_LANGUAGE):
+    # Read through the local metadata store, repeat lookups cost no network call
+    details = metadata_store.get_movie_details(movie_id, language)
+    if not details:
+        print(f"{get_timestamp()} Error fetching trailer for movie {movie_id}")
+        return None
+    return find_trailer(details)
+
+def get_localized_movie(movie_id, language):
+    # Title, overview and trailer of a movie in the given language
+    details = metadata_store.get_movie_details(movie_id, language)
+    if not details:
+        return None
+    return {
+        "title": details.get("title"),
+        "overview": details.get("overview"),
+        "trailer_url": find_trailer(details),
     }
-    try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
-        for video in data.get('results', []):
-            if video['type'] == 'Trailer' and video['site'] == 'YouTube':
-                return f"https://www.youtube.com/watch?v={video['key']}"
-    except requests.exceptions.RequestException as e:
-        print(f"{get_timestamp()} Error fetching trailer for movie {movie_id}: {e}")
-    return None
 
 def register_post(movie_id):
     print(f"{get_timestamp()} Registering post with ID: {movie_id}")
@@ -80,8 +89,75 @@ def register_post(movie_id):
     print(f"{get_timestamp()} Recent posts: {recent_posts}")
     save_recent_posts()
 
+def next_trending_reset(timestamp):
+    # /trending/movie/day is recomputed once a day at 00:00 UTC
+    now = datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc)
+    tomorrow = (now + datetime.timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return tomorrow.timestamp()
+
+def valid_trending_snapshot(snapshot):
+    return (isinstance(snapshot, dict)
+            and isinstance(snapshot.get("expires_at"), (int, float))
+            and isinstance(snapshot.get("movies"), list)
+            and all(isinstance(movie, dict) and "id" in movie for movie in snapshot["movies"]))
+
+def load_trending_snapshot():
+    global trending_snapshot
+    if trending_snapshot is None and os.path.exists(TRENDING_SNAPSHOT_FILE):
+        try:
+            with open(TRENDING_SNAPSHOT_FILE, "r") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"{get_timestamp()} Could not read trending snapshot ({e}), ignoring it.")
+            return None
+        if not valid_trending_snapshot(snapshot):
+            print(f"{get_timestamp()} Trending snapshot is malformed, ignoring it.")
+            return None
+        trending_snapshot = snapshot
+    return trending_snapshot
+
+def save_trending_snapshot(snapshot):
+    # Keeps the snapshot in memory even if writing the file fails
+    global trending_snapshot
+    trending_snapshot = snapshot
+    try:
+        with open(TRENDING_SNAPSHOT_FILE, "w") as f:
+            json.dump(snapshot, f)
+    except OSError as e:
+        print(f"{get_timestamp()} Could not save trending snapshot: {e}")
+
 def request_trending_movies():
+    # Trending movies from the daily snapshot, refetched only once the trending window has rolled over
+    snapshot = load_trending_snapshot()
+    if snapshot and time.time() < snapshot["expires_at"]:
+        print(f"{get_timestamp()} Using trending snapshot ({len(snapshot['movies'])} movies)")
+        return snapshot["movies"]
+
+    movies = fetch_trending_movies()
+    if not movies:
+        if snapshot:
+            print(f"{get_timestamp()} Falling back to the expired trending snapshot")
+            return snapshot["movies"]
+        return None
+
+    # Diff against the previous snapshot so newly trending titles can be preferred
+    previous_ids = {movie["id"] for movie in snapshot["movies"]} if snapshot else set()
+    for movie in movies:
+        movie["newly_trending"] = movie["id"] not in previous_ids
+    new_count = sum(movie["newly_trending"] for movie in movies)
+    print(f"{get_timestamp()} {new_count} newly trending movies since the last snapshot")
+
+    fetched_at = time.time()
+    save_trending_snapshot({
+        "fetched_at": fetched_at,
+        "expires_at": next_trending_reset(fetched_at),
+        "movies": movies,
+    })
+    return movies
+
+def fetch_trending_movies():
     # Get a list of trending movies
+    import requests
     API_KEY = os.getenv("TMDB_API_KEY")
     url = "https://api.themoviedb.org/3/trending/movie/day"
     params = {
@@ -106,8 +182,9 @@ def request_trending_movies():
         print(f"{get_timestamp()} Failed to decode JSON response.")
     return None
 
-def request_random_movie():
-    # Get a random movie
+def request_random_pool(pages=RANDOM_POOL_PAGES):
+    # Get a pool of movies from a few random discover pages
+    import requests
     API_KEY = os.getenv("TMDB_API_KEY")
     url = "https://api.themoviedb.org/3/discover/movie"
     params = {
@@ -118,7 +195,7 @@ def request_random_movie():
         "page": 1
     }
     try:
-        print(f"{get_timestamp()} Sending request to TMDB for a random movie (getting total pages)")
+        print(f"{get_timestamp()} Sending request to TMDB for random movies (getting total pages)")
         response = requests.get(url, params=params)
         response.raise_for_status()
         total_pages = response.json().get('total_pages')
@@ -126,20 +203,19 @@ def request_random_movie():
             print(f"{get_timestamp()} Could not get total pages for random movie.")
             return None
 
-        random_page = random.randint(1, min(total_pages, 500)) # TMDB limits to 500 pages
-        params["page"] = random_page
-        print(f"{get_timestamp()} Sending request to TMDB for a random movie (page {random_page})")
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
-        if not data.get('results'):
+        total_pages = min(total_pages, 500) # TMDB limits to 500 pages
+        pool = []
+        for random_page in random.sample(range(1, total_pages + 1), min(pages, total_pages)):
+            params["page"] = random_page
+            print(f"{get_timestamp()} Sending request to TMDB for random movies (page {random_page})")
+            response = requests.get(url, params=params)
+            response.raise_for_status()
+            pool.extend(response.json().get('results', []))
+        if not pool:
             print(f"{get_timestamp()} No results found for random movie.")
             return None
-        
-        random_movie = random.choice(data['results'])
-        random_movie['trailer_url'] = get_movie_trailer(random_movie['id'])
-        print(f"{get_timestamp()} Got random movie: {random_movie.get('title')}")
-        return random_movie
+        print(f"{get_timestamp()} Got {len(pool)} random candidates")
+        return pool
     except requests.exceptions.HTTPError as http_err:
         print(f"{get_timestamp()} HTTP error occurred: {http_err}")
     except requests.exceptions.RequestException as req_err:
@@ -148,50 +224,69 @@ def request_random_movie():
         print(f"{get_timestamp()} Failed to decode JSON response.")
     return None
 
+def get_recent_genre_ids():
+    # Genres of recently posted movies, from the metadata store only (no network calls)
+    genre_ids = []
+    for movie_id in recent_posts:
+        details = metadata_store.get_cached_details("movie", movie_id)
+        if details:
+            genre_ids.extend(genre['id'] for genre in details.get('genres', []))
+    return genre_ids
+
 # For trending:
 def pick_unique_trending(all_movies):
     print(f"{get_timestamp()} Picking unique trending movie")
-    for movie in all_movies:
-        if movie["id"] not in recent_posts:
+    recent_genre_ids = get_recent_genre_ids()
+    # Newly trending titles first, then the rest of the list; scoring picks within each group
+    newly_trending = [movie for movie in all_movies if movie.get("newly_trending")]
+    for candidates in (newly_trending, all_movies):
+        movie = scoring.pick_best(candidates, exclude_ids=recent_posts, recent_genre_ids=recent_genre_ids)
+        if movie:
             print(f"{get_timestamp()} Found unique movie: {movie['title']}")
             return movie
+    with_backdrop = [movie for movie in all_movies if movie.get("backdrop_path")]
+    if not with_backdrop:
+        print(f"{get_timestamp()} No trending movie with a picture found")
+        return None
     print(f"{get_timestamp()} No unique movie found, returning random from trending")
-    return random.choice(all_movies)  # fallback
+    return random.choice(with_backdrop)  # fallback
 
 # For random:
 def pick_unique_random():
     print(f"{get_timestamp()} Picking unique random movie")
     max_retries = 20
     for i in range(max_retries):
-        movie = request_random_movie()
-        if movie is None:
-            print(f"{get_timestamp()} Failed to fetch random movie (API error), attempt {i+1}/{max_retries}")
+        pool = request_random_pool()
+        if pool is None:
+            print(f"{get_timestamp()} Failed to fetch random movies (API error), attempt {i+1}/{max_retries}")
             time.sleep(2) # Wait a bit before retrying
             continue
 
-        if movie["id"] not in recent_posts:
+        movie = scoring.pick_best(pool, exclude_ids=recent_posts, recent_genre_ids=get_recent_genre_ids())
+        if movie:
+            movie['trailer_url'] = get_movie_trailer(movie['id'])
             print(f"{get_timestamp()} Found unique movie: {movie['title']}")
             return movie
         
-        print(f"{get_timestamp()} Movie '{movie['title']}' already in recent posts, trying again")
+        print(f"{get_timestamp()} No unposted candidate with a picture among {len(pool)}, trying again")
     
     print(f"{get_timestamp()} Could not find a unique random movie after {max_retries} attempts.")
     return None
 
 
-async def post_to_telegram(movie):
+async def post_to_telegram(movie, chat_id=None, bot=None, language=DEFAULT_LANGUAGE):
+    # Returns True if the post was sent, False if it was skipped.
+    # Pass `bot` to reuse one session across several channels (see tmdb_api/channels.py).
     print(f"{get_timestamp()} Start making post")
     BOT_TOKEN = os.getenv("TOKEN_TG_BOT_POSTER")
-    CHANNEL_ID = os.getenv("CHANNEL_TG")
+    CHANNEL_ID = chat_id or os.getenv("CHANNEL_TG")
     BASE_IMG = "https://image.tmdb.org/t/p/original"
 
-    if not all([BOT_TOKEN, CHANNEL_ID]):
+    if not CHANNEL_ID or not (bot or BOT_TOKEN):
         print(f"{get_timestamp()} Bot token or channel ID is not set. Please check your environment variables.")
-        return
+        return False
 
-    bot = Bot(token=BOT_TOKEN)
-    
-    print(f"{get_timestamp()} Making a new post")
+    print(f"{get_timestamp()} Making a new post for {CHANNEL_ID}")
     title = movie.get("title", "No title")
     date = movie.get("release_date", "No date")
     backdrop = movie.get("backdrop_path")
@@ -201,14 +296,14 @@ async def post_to_telegram(movie):
     id = movie.get("id")
     trailer_url = movie.get("trailer_url")
     genre_ids = movie.get("genre_ids", [])
-    genres = get_genre_names()
+    genres = get_genre_names(language)
     genre_names = [genres.get(genre_id) for genre_id in genre_ids if genres and genres.get(genre_id)]
     genre_hashtags = " ".join([f"#{genre.replace(' ', '')}" for genre in genre_names])
 
 
     if not backdrop:
         print(f"{get_timestamp()} No picture, skip")
-        return
+        return False
 
     img_url = BASE_IMG + backdrop
     text = f"""🎬 <u><b>{title}</b></u> ({date[:4]})
@@ -222,17 +317,26 @@ async def post_to_telegram(movie):
     if trailer_url:
         text += f" | <a href='{trailer_url}'>Trailer</a>"
 
-    await bot.send_photo(
-        chat_id=CHANNEL_ID,
-        photo=img_url,
-        caption=text,
-        parse_mode="HTML"
-    )
-    print(f"{get_timestamp()} Post sent")
-    await bot.session.close()
+    own_bot = bot is None
+    if own_bot:
+        from aiogram import Bot
+        bot = Bot(token=BOT_TOKEN)
+    try:
+        await bot.send_photo(
+            chat_id=CHANNEL_ID,
+            photo=img_url,
+            caption=text,
+            parse_mode="HTML"
+        )
+    finally:
+        if own_bot:
+            await bot.session.close()
+    print(f"{get_timestamp()} Post sent to {CHANNEL_ID}")
+    return True
 
 if __name__ == "__main__":
     load_dotenv(find_dotenv())
+    load_recent_posts()
     get_genre_names()
 
     async def test_posts():
@@ -0,0 +1,136 @@
+import datetime
+import json
+import math
+import os
+
+# Weights of each feature in the candidate score. Every feature is scaled to 0..1 first.
+# Override any of them with AUTOPOSTER_WEIGHTS in .env, e.g. AUTOPOSTER_WEIGHTS={"rating": 2.0}
+DEFAULT_WEIGHTS = {
+    "rating": 1.0,            # vote_average / 10, shrunk towards the mean for low vote counts
+    "votes": 0.5,             # log of vote_count relative to the pool
+    "popularity": 0.5,        # log of popularity relative to the pool
+    "recency": 0.3,           # 1 for this year's releases, halves every RECENCY_HALF_LIFE years
+    "genre_repeat": -1.0,     # how much of the candidate's genres were already in recent posts
+}
+RECENCY_HALF_LIFE = 5
+MIN_VOTES = 50  # votes needed before a rating is trusted
+TOP_K = 10
+MAX_WEIGHT = 1e6
+
+def valid_weights(weights, source):
+    # Keeps known keys with numeric values, warns about the rest
+    if not isinstance(weights, dict):
+        print(f"{source} must be a JSON object of weights, ignoring it.")
+        return {}
+    valid = {}
+    for key, value in weights.items():
+        if key not in DEFAULT_WEIGHTS:
+            print(f"{source}: unknown weight '{key}', ignoring it. Known weights: {', '.join(DEFAULT_WEIGHTS)}")
+            continue
+        try:
+            weight = float(value)
+        except (TypeError, ValueError):
+            weight = None
+        # Keep weights small enough that scores stay finite (rules out nan, inf and 1e308)
+        if weight is None or not math.isfinite(weight) or abs(weight) > MAX_WEIGHT:
+            print(f"{source}: weight '{key}' is not a usable number ({value!r}), ignoring it.")
+            continue
+        valid[key] = weight
+    return valid
+
+def get_weights(weights=None):
+    merged = dict(DEFAULT_WEIGHTS)
+    override = os.getenv("AUTOPOSTER_WEIGHTS")
+    if override:
+        try:
+            merged.update(valid_weights(json.loads(override), "AUTOPOSTER_WEIGHTS"))
+        except ValueError:
+            print("AUTOPOSTER_WEIGHTS is not valid JSON, using default weights.")
+    if weights:
+        merged.update(valid_weights(weights, "weights"))
+    return merged
+
+def release_year(movie):
+    date = movie.get("release_date") or ""
+    return int(date[:4]) if date[:4].isdigit() else 0
+
+def score_candidates(candidates, recent_genre_ids=(), weights=None):
+    """
+    Scores a pool of TMDB movies in one vectorized pass and returns a NumPy array of scores.
+    `recent_genre_ids` is a flat list of genre ids of recently posted movies (repeats count).
+    """
+    import numpy as np
+
+    weights = get_weights(weights)
+    n = len(candidates)
+
+    rating = np.fromiter((movie.get("vote_average") or 0 for movie in candidates), float, n)
+    votes = np.fromiter((movie.get("vote_count") or 0 for movie in candidates), float, n)
+    popularity = np.fromiter((movie.get("popularity") or 0 for movie in candidates), float, n)
+    year = np.fromiter((release_year(movie) for movie in candidates), float, n)
+
+    # Bayesian average so a 10/10 with 3 votes doesn't beat an 8/10 with 5000
+    mean_rating = rating[votes > 0].mean() if (votes > 0).any() else 0
+    rating = (rating * votes + mean_rating * MIN_VOTES) / (votes + MIN_VOTES) / 10
+
+    votes = np.log1p(votes)
+    votes /= votes.max() or 1
+    popularity = np.log1p(popularity)
+    popularity /= popularity.max() or 1
+
+    age = np.clip(datetime.date.today().year - year, 0, None)
+    recency = np.where(year > 0, 0.5 ** (age / RECENCY_HALF_LIFE), 0)
+
+    # Multi-hot genre matrix (candidates x genres) against how often each genre was posted recently
+    genre_repeat = np.zeros(n)
+    if len(recent_genre_ids):
+        genre_index = {}
+        rows, cols = [], []
+        for row, movie in enumerate(candidates):
+            for genre_id in movie.get("genre_ids", []):
+                rows.append(row)
+                cols.append(genre_index.setdefault(genre_id, len(genre_index)))
+        genres = np.zeros((n, len(genre_index) + 1))
+        genres[np.array(rows, dtype=int), np.array(cols, dtype=int)] = 1
+        recent = np.zeros(len(genre_index) + 1)
+        for genre_id in recent_genre_ids:
+            if genre_id in genre_index:
+                recent[genre_index[genre_id]] += 1
+        recent /= recent.max() or 1
+        genre_count = genres.sum(axis=1)
+        genre_repeat = np.divide(genres @ recent, genre_count, out=np.zeros(n), where=genre_count > 0)
+
+    return (weights["rating"] * rating
+            + weights["votes"] * votes
+            + weights["popularity"] * popularity
+            + weights["recency"] * recency
+            + weights["genre_repeat"] * genre_repeat)
+
+def pick_best(candidates, exclude_ids=(), recent_genre_ids=(), weights=None, top_k=TOP_K):
+    """
+    Scores the pool and picks weighted-random from the top_k candidates that have a backdrop
+    and are not in `exclude_ids`. Returns None if no candidate qualifies.
+    """
+    import numpy as np
+
+    if not candidates:
+        return None
+    scores = score_candidates(candidates, recent_genre_ids, weights)
+    excluded = set(exclude_ids)
+    # post_to_telegram skips movies without a backdrop, so they would waste the slot
+    allowed = np.fromiter((movie["id"] not in excluded and bool(movie.get("backdrop_path"))
+                           for movie in candidates), bool, len(candidates))
+    if not allowed.any():
+        return None
+    scores = np.where(allowed, scores, -np.inf)
+
+    k = min(top_k, int(allowed.sum()))
+    top = np.argpartition(scores, -k)[-k:]
+    # Shift so the weakest of the top still has a small chance
+    chances = scores[top] - scores[top].min() + 0.1
+    total = chances.sum()
+    if not np.isfinite(chances).all() or not total > 0:
+        # Degenerate scores, pick uniformly among the top instead
+        chances, total = np.ones(len(top)), len(top)
+    choice = np.random.default_rng().choice(top, p=chances / total)
+    return candidates[int(choice)]
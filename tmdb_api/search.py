@@ -1,9 +1,9 @@
-import requests
+import asyncio
+import math
 import os
 import socket
 from dotenv import load_dotenv, find_dotenv
-
-load_dotenv(find_dotenv())
+from tmdb_api import metadata_store
 
 def get_env_variable(key: str, default: str = None) -> str:
     """
@@ -27,13 +27,19 @@ def patched_getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
         return original_getaddrinfo('3.164.230.99', port, family, type, proto, flags)
     # For all other hosts, use the original function
     return original_getaddrinfo(host, port, family, type, proto, flags)
-socket.getaddrinfo = patched_getaddrinfo
+
+def install_dns_workaround():
+    """
+    Installs the DNS patch. Called from the application init step instead of at import time.
+    """
+    socket.getaddrinfo = patched_getaddrinfo
 # --- End DNS Workaround ---
 
 def search_movie(keyword: str):
     """
     Searches for a movie using the TMDB API.
     """
+    import requests
     access_token = get_env_variable("TMDB_ACCESS_TOKEN")
     url = f"https://api.themoviedb.org/3/search/movie?query={keyword}&page=1"
 
@@ -63,6 +69,7 @@ def search_tv(keyword: str):
     """
     Searches for a TV show using the TMDB API.
     """
+    import requests
     access_token = get_env_variable("TMDB_ACCESS_TOKEN")
     url = f"https://api.themoviedb.org/3/search/tv?query={keyword}&page=1"
 
@@ -88,27 +95,51 @@ def search_tv(keyword: str):
     except ValueError:
         return "Failed to decode JSON response."
 
-def get_tv_details(tv_id: int):
+async def search_all(keyword: str):
     """
-    Retrieves details for a specific TV show, including seasons.
+    Searches movies and TV shows concurrently and returns one list ranked by popularity and vote count.
+    Each item gets a `media_type` of 'movie' or 'tv'.
     """
-    access_token = get_env_variable("TMDB_ACCESS_TOKEN")
-    url = f"https://api.themoviedb.org/3/tv/{tv_id}"
+    movies, tv_shows = await asyncio.gather(
+        asyncio.to_thread(search_movie, keyword),
+        asyncio.to_thread(search_tv, keyword)
+    )
+
+    merged = []
+    errors = []
+    for media_type, results in (('movie', movies), ('tv', tv_shows)):
+        if isinstance(results, list):
+            merged.extend({**item, 'media_type': media_type} for item in results)
+        else:
+            errors.append(results)
+            if not results.startswith("No "):
+                print(f"Error searching {media_type} for '{keyword}': {results}")
 
-    headers = {
-        "accept": "application/json",
-        "Authorization": f"Bearer {access_token}"
-    }
+    if not merged:
+        if all(error.startswith("No ") for error in errors):
+            return "No movies or TV shows found for that keyword."
+        return next(error for error in errors if not error.startswith("No "))
 
-    try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching TV details: {e}")
-        return None
+    # Log-scaled popularity and vote count, each relative to the best in the list, weigh equally
+    max_popularity = math.log1p(max(item.get('popularity') or 0 for item in merged)) or 1
+    max_votes = math.log1p(max(item.get('vote_count') or 0 for item in merged)) or 1
+
+    def rank(item):
+        return (math.log1p(item.get('popularity') or 0) / max_popularity
+                + math.log1p(item.get('vote_count') or 0) / max_votes)
+
+    return sorted(merged, key=rank, reverse=True)
+
+def get_tv_details(tv_id: int):
+    """
+    Retrieves details for a specific TV show, including seasons.
+    Read through the local metadata store, so repeat lookups cost no network call.
+    """
+    return metadata_store.get_tv_details(tv_id)
 
 if __name__ == "__main__":
+    load_dotenv(find_dotenv())
+    install_dns_workaround()
     print("Searching for movie 'filth':")
     print(search_movie("filth"))
     print("\nSearching for TV show 'The Boys':")